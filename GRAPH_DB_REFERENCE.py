@@ -6,6 +6,12 @@ Graph Database - Quick Reference Guide
 This file contains quick copy-paste snippets for common operations.
 """
 
+import heapq
+from itertools import combinations
+from operator import itemgetter
+
+import numpy as np
+
 from graph_db import GraphDatabase, GraphNode, GraphRelationship
 
 # =============================================================================
@@ -112,13 +118,24 @@ scores = db.compute_graph_scores(
 )
 # Returns: dict mapping node_id -> score
 
-# Sort by relevance
-sorted_nodes = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-for node_id, score in sorted_nodes[:10]:  # Top 10
+# Top 10 by relevance (heap selection, no full sort)
+for node_id, score in heapq.nlargest(10, scores.items(), key=itemgetter(1)):
     node = db.get_node(node_id)
     print(f"Score {score:.2f}: {node.text}")
 
 
+# =============================================================================
+# EMBEDDING SEARCH
+# =============================================================================
+
+# Rank nodes by cosine similarity to a query vector
+matches = db.search_by_embedding(
+    query_embedding=[0.1, 0.2, 0.3, 0.4],
+    top_k=5
+)
+# Returns: list of (node_id, cosine_similarity) tuples, best first
+
+
 # =============================================================================
 # PERSISTENCE
 # =============================================================================
@@ -139,7 +156,38 @@ print(f"Nodes: {stats['nodes']}, Edges: {stats['edges']}")
 # HYBRID SEARCH PATTERN (Vector + Graph)
 # =============================================================================
 
-def hybrid_search(query_embedding, vector_db, graph_db, k=10, depth=2):
+def best_score_over_seeds(graph_db, seeds, depth):
+    """
+    Expand all seed nodes and score everything they reach.
+    
+    Same result as running traverse() + compute_graph_scores() once per
+    seed and keeping each node's best score over all seeds (a node close
+    to one seed can still score higher through another). Each seed's BFS
+    runs over the graph's cached CSR adjacency and is memoized until the
+    next mutation, so repeated seeds and queries cost a dict lookup.
+    
+    Args:
+        graph_db: Graph database
+        seeds: Iterable of starting node IDs
+        depth: Maximum traversal depth
+        
+    Returns:
+        Tuple of (set of reachable node IDs, dict mapping node_id -> score).
+        The dict lists the seeds first, in the order given.
+    """
+    seed_ids = [seed_id for seed_id in dict.fromkeys(seeds) if seed_id in graph_db.graph.nodes]
+    graph_scores = dict.fromkeys(seed_ids, float('inf'))
+    
+    for seed_id in seed_ids:
+        for node_id, score in graph_db.compute_graph_scores(seed_id, depth).items():
+            best = graph_scores.get(node_id)
+            if best is None or score > best:
+                graph_scores[node_id] = score
+    
+    return set(graph_scores), graph_scores
+
+
+def hybrid_search(query_embedding, vector_db, graph_db, k=10, depth=2, top_k=None):
     """
     Combine vector similarity with graph relationships.
     
@@ -149,6 +197,7 @@ def hybrid_search(query_embedding, vector_db, graph_db, k=10, depth=2):
         graph_db: Graph database
         k: Number of initial vector results
         depth: Graph traversal depth
+        top_k: Number of results to return (default: all candidates)
         
     Returns:
         List of (node_id, combined_score) tuples
@@ -157,34 +206,34 @@ def hybrid_search(query_embedding, vector_db, graph_db, k=10, depth=2):
     vector_results = vector_db.search(query_embedding, k=k)
     # Returns: [(node_id, vector_score), ...]
     
-    # Step 2: Expand with graph
-    all_candidates = set()
-    for node_id, _ in vector_results:
-        related = graph_db.traverse(node_id, depth=depth)
-        all_candidates.update(related)
-    
-    # Step 3: Compute graph scores
-    graph_scores = {}
-    for node_id, _ in vector_results:
-        scores = graph_db.compute_graph_scores(node_id, depth=depth)
-        for gid, gscore in scores.items():
-            if gid not in graph_scores or scores[gid] > graph_scores[gid]:
-                graph_scores[gid] = gscore
+    # Step 2 + 3: Expand with graph and compute graph scores in one pass
+    _, graph_scores = best_score_over_seeds(
+        graph_db,
+        [node_id for node_id, _ in vector_results],
+        depth
+    )
     
-    # Step 4: Combine scores
-    vector_score_map = dict(vector_results)
-    combined = []
-    for node_id in all_candidates:
-        vs = vector_score_map.get(node_id, 0)
-        gs = graph_scores.get(node_id, 0)
-        if gs == float('inf'):
-            gs = 10.0  # Cap infinite scores
-        combined_score = 0.7 * vs + 0.3 * gs  # Weighted combination
-        combined.append((node_id, combined_score))
+    # Step 4: Combine scores over parallel float32 arrays. Each vector hit
+    # writes into its own node's row (a repeated hit keeps its last score,
+    # as dict(vector_results) would); hits outside the graph are dropped.
+    ids = list(graph_scores)
+    row = {node_id: i for i, node_id in enumerate(ids)}
+    vs = np.zeros(len(ids), dtype=np.float32)
+    for node_id, score in vector_results:
+        i = row.get(node_id)
+        if i is not None:
+            vs[i] = score
+    gs = np.fromiter(graph_scores.values(), dtype=np.float32, count=len(ids))
+    gs[np.isinf(gs)] = 10.0  # Cap infinite scores
+    final = 0.7 * vs + 0.3 * gs  # Weighted combination
     
-    # Sort by combined score
-    combined.sort(key=lambda x: x[1], reverse=True)
-    return combined
+    # Sort by combined score, partially selecting the top_k first
+    if top_k is not None and top_k < len(ids):
+        order = np.argpartition(-final, top_k)[:top_k]
+        order = order[np.argsort(-final[order], kind="stable")]
+    else:
+        order = np.argsort(-final, kind="stable")
+    return [(ids[i], float(final[i])) for i in order]
 
 
 # =============================================================================
@@ -215,13 +264,10 @@ def build_document_graph(documents):
     
     # Add relationships
     # Example 1: Sequential documents
-    for i in range(len(documents) - 1):
-        db.create_edge(
-            node_map[documents[i]['id']],
-            node_map[documents[i + 1]['id']],
-            rel_type="precedes",
-            weight=1.0
-        )
+    edges = [
+        (node_map[prev['id']], node_map[curr['id']], "precedes", 1.0)
+        for prev, curr in zip(documents, documents[1:])
+    ]
     
     # Example 2: Concept linking (if documents share tags)
     from collections import defaultdict
@@ -230,16 +276,15 @@ def build_document_graph(documents):
         for tag in doc.get('metadata', {}).get('tags', []):
             tag_to_docs[tag].append(doc['id'])
     
-    for tag, doc_ids in tag_to_docs.items():
-        # Link documents with same tag
-        for i in range(len(doc_ids)):
-            for j in range(i + 1, len(doc_ids)):
-                db.create_edge(
-                    node_map[doc_ids[i]],
-                    node_map[doc_ids[j]],
-                    rel_type="related_by_" + tag,
-                    weight=1.5
-                )
+    # Link every pair of documents with the same tag
+    edges.extend(
+        (node_map[a], node_map[b], "related_by_" + tag, 1.5)
+        for tag, doc_ids in tag_to_docs.items()
+        for a, b in combinations(doc_ids, 2)
+    )
+    
+    # Insert all relationships at once
+    db.create_edges_bulk(edges)
     
     return db
 
@@ -271,12 +316,13 @@ if __name__ == "__main__":
     related = db.traverse(doc1.id, depth=2)
     scores = db.compute_graph_scores(doc1.id, depth=2)
     
-    # Show results sorted by relevance
+    # Show results sorted by relevance, fetching each node only once
+    nodes_fetched = {nid: db.get_node(nid) for nid in scores}
     doc_scores = {nid: sc for nid, sc in scores.items() 
-                  if db.get_node(nid).metadata.get('type') != 'concept'}
+                  if nodes_fetched[nid].metadata.get('type') != 'concept'}
     
-    for node_id in sorted(doc_scores, key=doc_scores.get, reverse=True):
-        node = db.get_node(node_id)
+    for node_id in heapq.nlargest(10, doc_scores, key=doc_scores.get):
+        node = nodes_fetched[node_id]
         score = doc_scores[node_id]
         score_str = "∞" if score == float('inf') else f"{score:.2f}"
         print(f"  [{score_str}] {node.text} (page {node.metadata['page']})")
@@ -1,6 +1,18 @@
-from functools import lru_cache
+import threading
+from fastapi import FastAPI, Request
 from app.service import HybridRetrievalService
 
-@lru_cache()
-def get_service() -> HybridRetrievalService:
-    return HybridRetrievalService()
+_init_lock = threading.Lock()
+
+def init_service(app: FastAPI) -> HybridRetrievalService:
+    """Create the app-wide service on app.state, unless it already exists."""
+    with _init_lock:
+        if getattr(app.state, "service", None) is None:
+            app.state.service = HybridRetrievalService()
+    return app.state.service
+
+def get_service(request: Request) -> HybridRetrievalService:
+    # Normally created by the lifespan handler; built on first use when the
+    # app runs without one (e.g. a TestClient not used as a context manager)
+    service = getattr(request.app.state, "service", None)
+    return service if service is not None else init_service(request.app)
@@ -1,10 +1,22 @@
 import os
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from app.dependencies import init_service
 from app.routers import nodes, edges, search, pdf, graph, stats
 
-app = FastAPI(title="Hybrid Retrieval System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model and databases once, before serving, and
+    # share the service through app.state
+    service = await run_in_threadpool(init_service, app)
+    yield
+    # Write out any graph changes still waiting on the save debounce
+    await run_in_threadpool(service.flush)
+
+app = FastAPI(title="Hybrid Retrieval System", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -1,9 +1,13 @@
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Request bodies are never mutated after validation
+class RequestModel(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
 # ==================== Node Models ====================
 
-class NodeCreate(BaseModel):
+class NodeCreate(RequestModel):
     id: str
     text: str
     metadata: Dict[str, Any] = Field(default_factory=dict)
@@ -22,7 +26,7 @@ class NodeCreateResponse(BaseModel):
     id: str
     embedding_dim: Optional[int] = None
 
-class NodeUpdate(BaseModel):
+class NodeUpdate(RequestModel):
     text: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     regen_embedding: bool = False
@@ -39,7 +43,7 @@ class NodeDeleteResponse(BaseModel):
 
 # ==================== Edge Models ====================
 
-class EdgeCreate(BaseModel):
+class EdgeCreate(RequestModel):
     source: str
     target: str
     type: str
@@ -68,7 +72,7 @@ class EdgeGetResponse(BaseModel):
     type: str
     weight: float
 
-class EdgeUpdate(BaseModel):
+class EdgeUpdate(RequestModel):
     weight: float
 
 class EdgeUpdateResponse(BaseModel):
@@ -82,10 +86,12 @@ class EdgeDeleteResponse(BaseModel):
 
 # ==================== Search Models ====================
 
-class VectorSearchRequest(BaseModel):
+class VectorSearchRequest(RequestModel):
     query_text: str
     top_k: int = 5
     metadata_filter: Optional[Dict[str, Any]] = None
+    # Precomputed query embedding; skips encoding query_text when given
+    embedding: Optional[List[float]] = None
 
 class VectorSearchResultItem(BaseModel):
     id: str
@@ -108,7 +114,7 @@ class GraphTraversalResponse(BaseModel):
     depth: int
     nodes: List[GraphTraversalNode]
 
-class HybridSearchRequest(BaseModel):
+class HybridSearchRequest(RequestModel):
     query_text: str
     vector_weight: float = 0.6
     graph_weight: float = 0.4
@@ -0,0 +1,34 @@
+"""
+PDF page extraction for worker processes.
+
+Kept free of the service's heavy imports so spawned workers start quickly.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from pypdf import PdfReader
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def extract_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF file."""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all PDF uploads, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the server process runs model and
+            # request threads that a forked child must not inherit
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _pool
@@ -11,30 +11,31 @@ def get_graph_data(service: HybridRetrievalService = Depends(get_service)):
     Get all nodes and edges for graph visualization.
     Returns the complete graph structure.
     """
-    nodes = []
-    edges = []
+    with service.lock.read_locked():
+        graph = service.graph_db.graph
     
-    # Get all nodes from the graph
-    for node_id in service.graph_db.graph.nodes():
-        node = service.graph_db.get_node(node_id)
-        if node:
+        # Read node attributes straight from the graph instead of building a GraphNode per node
+        nodes = []
+        for node_id, data in graph.nodes(data=True):
+            text = data["text"]
             nodes.append({
-                "id": node.id,
-                "label": node.text[:50] + "..." if len(node.text) > 50 else node.text,
-                "text": node.text,
-                "metadata": node.metadata
+                "id": node_id,
+                "label": text[:50] + "..." if len(text) > 50 else text,
+                "text": text,
+                "metadata": data["metadata"]
             })
     
-    # Get all edges from the graph
-    for source, target, key, edge_data in service.graph_db.graph.edges(keys=True, data=True):
-        edges.append({
-            "id": edge_data.get("id"),
-            "from": source,
-            "to": target,
-            "label": edge_data.get("type", ""),
-            "weight": edge_data.get("weight", 1.0),
-            "type": edge_data.get("type", "")
-        })
+        edges = [
+            {
+                "id": edge_data.get("id"),
+                "from": source,
+                "to": target,
+                "label": edge_data.get("type", ""),
+                "weight": edge_data.get("weight", 1.0),
+                "type": edge_data.get("type", "")
+            }
+            for source, target, edge_data in graph.edges(data=True)
+        ]
     
     return {
         "nodes": nodes,
@@ -1,31 +1,41 @@
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.models import NodeCreate, NodeResponse, NodeCreateResponse, NodeUpdate, NodeUpdateResponse, NodeDeleteResponse
 from app.service import HybridRetrievalService
 from app.dependencies import get_service
 
 router = APIRouter(prefix="/nodes", tags=["nodes"])
 
-@router.post("", response_model=NodeCreateResponse)
-def create_node(node: NodeCreate, service: HybridRetrievalService = Depends(get_service)):
-    return service.create_node(node)
+@router.post("", response_model=NodeCreateResponse, response_model_exclude_none=True)
+async def create_node(node: NodeCreate, service: HybridRetrievalService = Depends(get_service)):
+    return await run_in_threadpool(service.create_node, node)
 
-@router.get("/{node_id}", response_model=NodeResponse)
-def get_node(node_id: str, service: HybridRetrievalService = Depends(get_service)):
-    node = service.get_node(node_id)
+@router.post("/bulk", response_model=List[NodeCreateResponse], response_model_exclude_none=True)
+async def create_nodes_bulk(nodes: List[NodeCreate], service: HybridRetrievalService = Depends(get_service)):
+    return await run_in_threadpool(service.create_nodes_bulk, nodes)
+
+@router.post("/lookup", response_model=List[NodeResponse], response_model_exclude_none=True)
+async def get_nodes_bulk(node_ids: List[str], service: HybridRetrievalService = Depends(get_service)):
+    return await run_in_threadpool(service.get_nodes_bulk, node_ids)
+
+@router.get("/{node_id}", response_model=NodeResponse, response_model_exclude_none=True)
+async def get_node(node_id: str, service: HybridRetrievalService = Depends(get_service)):
+    node = await run_in_threadpool(service.get_node, node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
     return node
 
-@router.put("/{node_id}", response_model=NodeUpdateResponse)
-def update_node(node_id: str, update: NodeUpdate, service: HybridRetrievalService = Depends(get_service)):
-    response = service.update_node(node_id, update)
+@router.put("/{node_id}", response_model=NodeUpdateResponse, response_model_exclude_none=True)
+async def update_node(node_id: str, update: NodeUpdate, service: HybridRetrievalService = Depends(get_service)):
+    response = await run_in_threadpool(service.update_node, node_id, update)
     if not response:
         raise HTTPException(status_code=404, detail="Node not found")
     return response
 
-@router.delete("/{node_id}", response_model=NodeDeleteResponse)
-def delete_node(node_id: str, service: HybridRetrievalService = Depends(get_service)):
-    response = service.delete_node(node_id)
+@router.delete("/{node_id}", response_model=NodeDeleteResponse, response_model_exclude_none=True)
+async def delete_node(node_id: str, service: HybridRetrievalService = Depends(get_service)):
+    response = await run_in_threadpool(service.delete_node, node_id)
     if not response:
         raise HTTPException(status_code=404, detail="Node not found")
     return response
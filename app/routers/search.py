@@ -1,5 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.models import (
     VectorSearchRequest, VectorSearchResponse,
     GraphTraversalResponse,
@@ -10,17 +11,27 @@ from app.dependencies import get_service
 
 router = APIRouter(prefix="/search", tags=["search"])
 
-@router.post("/vector", response_model=VectorSearchResponse)
-def vector_search(request: VectorSearchRequest, service: HybridRetrievalService = Depends(get_service)):
-    return service.vector_search(request.query_text, request.top_k, request.metadata_filter)
+@router.post("/vector", response_model=VectorSearchResponse, response_model_exclude_none=True)
+async def vector_search(request: VectorSearchRequest, service: HybridRetrievalService = Depends(get_service)):
+    try:
+        return await run_in_threadpool(
+            service.vector_search,
+            request.query_text,
+            request.top_k,
+            request.metadata_filter,
+            request.embedding
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
 
-@router.get("/graph", response_model=GraphTraversalResponse)
-def graph_traversal(start_id: str, depth: int = 2, type_filter: Optional[str] = None, service: HybridRetrievalService = Depends(get_service)):
-    return service.graph_traversal(start_id, depth, type_filter)
+@router.get("/graph", response_model=GraphTraversalResponse, response_model_exclude_none=True)
+async def graph_traversal(start_id: str, depth: int = 2, type_filter: Optional[str] = None, service: HybridRetrievalService = Depends(get_service)):
+    return await run_in_threadpool(service.graph_traversal, start_id, depth, type_filter)
 
-@router.post("/hybrid", response_model=HybridSearchResponse)
-def hybrid_search(request: HybridSearchRequest, service: HybridRetrievalService = Depends(get_service)):
-    return service.hybrid_search(
+@router.post("/hybrid", response_model=HybridSearchResponse, response_model_exclude_none=True)
+async def hybrid_search(request: HybridSearchRequest, service: HybridRetrievalService = Depends(get_service)):
+    return await run_in_threadpool(
+        service.hybrid_search,
         request.query_text,
         request.vector_weight,
         request.graph_weight,
@@ -1,28 +1,29 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.dependencies import get_service
 from app.service import HybridRetrievalService
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
 @router.get("")
-def get_stats(service: HybridRetrievalService = Depends(get_service)):
+async def get_stats(service: HybridRetrievalService = Depends(get_service)):
     """
     Get system statistics including node count, edge count, and other metrics.
     """
+    return await run_in_threadpool(_collect_stats, service)
+
+def _collect_stats(service: HybridRetrievalService):
     # Get graph stats
-    graph_stats = service.graph_db.get_stats()
+    with service.lock.read_locked():
+        graph_stats = service.graph_db.get_stats()
     
     # Get vector DB stats
     vector_count = 0
     try:
-        # Try to get count from ChromaDB collection
-        # ChromaDB stores data in a collection, we can try to get all IDs
+        # Count in the collection's store instead of fetching every ID
         collection = service.vector_db.db._collection
         if collection:
-            # Get all IDs to count documents
-            result = collection.get()
-            if result and 'ids' in result:
-                vector_count = len(result['ids'])
+            vector_count = collection.count()
     except Exception as e:
         # If we can't get the count, use graph node count as approximation
         # (assuming nodes with embeddings are in vector DB)
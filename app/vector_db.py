@@ -1,44 +1,301 @@
 import os
-# Disable ChromaDB telemetry
-os.environ["ANONYMIZED_TELEMETRY"] = "False"
-
-from typing import List, Dict, Any, Optional, Tuple
+import functools
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 import chromadb
 
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent embedding requests into a single model call.
+    
+    Each caller blocks in embed() while one worker thread drains the queue,
+    waiting up to max_wait_ms for more requests before encoding the batch.
+    """
+    
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self._embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+    
+    def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing the model call with concurrent callers."""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                vectors = self._embed_batch([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+
+class EmbeddingCache:
+    """
+    Document embeddings persisted in SQLite, keyed by a hash of the text.
+    
+    Keys also cover a model tag, so vectors from another model, backend or
+    precision are never returned. Vectors are stored as float32 bytes.
+    """
+    
+    # Keys per SELECT, below SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 500
+    
+    def __init__(self, path: str, model_tag: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._model_tag = model_tag.encode("utf-8") + b"\0"
+    
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(self._model_tag + text.encode("utf-8"), digest_size=16).digest()
+    
+    def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Cached embeddings of those texts that have one."""
+        keys = {self._key(text): text for text in texts}
+        key_list = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(key_list), self.LOOKUP_CHUNK):
+                chunk = key_list[start:start + self.LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for key, vector in rows:
+                    found[keys[key]] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+    
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (self._key(text), np.asarray(vector, dtype=np.float32).tobytes())
+                    for text, vector in zip(texts, vectors)
+                ]
+            )
+            self._conn.commit()
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Texts per encoder forward pass. SentenceTransformer sorts texts by length
+# before batching, so larger batches mostly pad chunks of similar length.
+EMBEDDING_BATCH_SIZE = 128
+
+# Encoder precisions selectable with the EMBEDDING_DTYPE env variable
+EMBEDDING_DTYPES = ("auto", "fp32", "fp16", "int8")
+
+# Inference runtimes selectable with the EMBEDDING_BACKEND env variable
+# ("onnx" runs the encoder on ONNX Runtime and needs optimum[onnxruntime])
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+@functools.lru_cache(maxsize=None)
+def load_embedding_model(
+    model_name: str, dtype: str = "auto", backend: str = "torch"
+) -> Tuple[HuggingFaceEmbeddings, str]:
+    """
+    Load an embedding model once per process, precision and backend.
+    
+    Every VectorDatabase shares the cached instance instead of loading its
+    own copy of the weights. The first load also sizes torch's thread pool
+    to the CPUs this process may actually run on (torch otherwise counts
+    every core on the machine, oversubscribing containers).
+    
+    The onnx backend exports the model to ONNX on first use and runs it on
+    ONNX Runtime; the torch precision switches do not apply to it.
+    
+    Returns:
+        Tuple of (embeddings, precision actually in use)
+    """
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"EMBEDDING_DTYPE must be one of {EMBEDDING_DTYPES}, got {dtype!r}")
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"EMBEDDING_BACKEND must be one of {EMBEDDING_BACKENDS}, got {backend!r}")
+    
+    import torch
+    if hasattr(os, "sched_getaffinity"):
+        torch.set_num_threads(len(os.sched_getaffinity(0)))
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        pass  # Only settable before torch's first parallel work
+    
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"backend": backend},
+        encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE}
+    )
+    # langchain-huggingface keeps the SentenceTransformer in `client` up to
+    # 0.0.x and in the private `_client` since; without either stay fp32
+    model = getattr(embeddings, "_client", None) or getattr(embeddings, "client", None)
+    if backend != "torch" or model is None:
+        return embeddings, "fp32"
+    return embeddings, _set_embedding_dtype(model, dtype)
+
+def _set_embedding_dtype(model, dtype: str) -> str:
+    """
+    Switch a SentenceTransformer to a lower precision for faster embedding.
+    
+    fp16 halves the weights and is only used on a GPU. int8 dynamically
+    quantizes the Linear layers and is only used on CPU. Elsewhere the
+    model stays fp32. "auto" means fp16 on a GPU and fp32 otherwise.
+    Vectors are returned as float32 either way, so the Chroma collection
+    is unaffected.
+    
+    Returns:
+        The precision actually in use
+    """
+    if dtype == "auto":
+        dtype = "fp16" if model.device.type == "cuda" else "fp32"
+    if dtype == "fp32":
+        return dtype
+    
+    import torch
+    # fp16 needs GPU kernels; dynamic int8 quantization is CPU-only
+    if model.device.type != ("cuda" if dtype == "fp16" else "cpu"):
+        return "fp32"
+    if dtype == "fp16":
+        model.half()
+    else:
+        torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    model.eval()
+    return dtype
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_batcher(model_name: str, dtype: str = "auto", backend: str = "torch") -> EmbeddingBatcher:
+    """The EmbeddingBatcher of a loaded model, shared like the model itself."""
+    embeddings, _ = load_embedding_model(model_name, dtype, backend)
+    return EmbeddingBatcher(embeddings.embed_documents)
+
+# Number of distinct query texts whose embeddings are kept, process-wide
+QUERY_CACHE_SIZE = 1024
+
+def normalize_query(query: str) -> str:
+    """
+    Query text as the encoder sees it: lower-cased, whitespace collapsed.
+    
+    all-MiniLM-L6-v2's tokenizer is uncased and splits on whitespace, so
+    queries differing only in case or spacing share one embedding.
+    """
+    return " ".join(query.split()).lower()
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _cached_query_embedding(batcher: EmbeddingBatcher, query: str) -> Tuple[float, ...]:
+    return tuple(batcher.embed(query))
+
 class VectorDatabase:
-    def __init__(self, persist_directory: str):
+    # Largest number of documents sent to Chroma in one write
+    MAX_BATCH_SIZE = 256
+
+    def __init__(self, persist_directory: str, hnsw_params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            persist_directory: Where Chroma stores the collection
+            hnsw_params: Chroma "hnsw:*" index settings (e.g. "hnsw:M").
+                Only applied when the collection is first created.
+        """
         self.persist_directory = persist_directory
-        self.embedding_function = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        # Shared with every other VectorDatabase in the process
+        dtype = os.environ.get("EMBEDDING_DTYPE", "auto").lower()
+        backend = os.environ.get("EMBEDDING_BACKEND", "torch").lower()
+        self.embedding_function, self.embedding_dtype = load_embedding_model(EMBEDDING_MODEL, dtype, backend)
+        # Concurrent queries (which share the read lock) share model calls
+        self.batcher = get_embedding_batcher(EMBEDDING_MODEL, dtype, backend)
         # Disable telemetry to reduce noise
         settings = chromadb.config.Settings(anonymized_telemetry=False)
         
         self.db = Chroma(
             persist_directory=self.persist_directory,
             embedding_function=self.embedding_function,
-            client_settings=settings
+            client_settings=settings,
+            collection_metadata=hnsw_params
         )
-
-    def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any]):
-        """Add or update a document in the vector store."""
-        self.db.add_texts(
-            texts=[text],
-            metadatas=[metadata],
-            ids=[doc_id]
+        # Chroma has created persist_directory by now
+        self.embedding_cache = EmbeddingCache(
+            os.path.join(self.persist_directory, "embedding_cache.sqlite3"),
+            f"{EMBEDDING_MODEL}:{backend}:{self.embedding_dtype}"
         )
+        # Metric the collection was created with (hnsw:* only applies then)
+        self.distance_space = (self.db._collection.metadata or {}).get("hnsw:space", "l2")
+
+    def add_document(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]]):
+        """
+        Add or update a document in the vector store.
+        
+        Embedded directly rather than through the batcher: writes run one
+        at a time under the service's write lock, so there is nothing to
+        batch with and the batching wait would only hold the lock longer.
+        """
+        self._upsert([doc_id], self.embedding_function.embed_documents([text]), [text], [metadata])
 
-    def add_documents(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]):
-        """Add multiple documents in batch."""
+    def add_documents(self, ids: List[str], texts: List[str], metadatas: List[Optional[Dict[str, Any]]]):
+        """
+        Add or update multiple documents.
+        
+        Texts embedded before (by any earlier run) are read from the
+        embedding cache. The rest are embedded in one embed_documents call
+        (the encoder batches internally) and cached. Everything is then
+        written to Chroma in upserts of at most MAX_BATCH_SIZE documents.
+        """
         if not ids:
             return
-        self.db.add_texts(
-            texts=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        vectors = self.embedding_cache.get_many(texts)
+        misses = list(dict.fromkeys(text for text in texts if text not in vectors))
+        if misses:
+            new_vectors = self.embedding_function.embed_documents(misses)
+            self.embedding_cache.put_many(misses, new_vectors)
+            vectors.update(zip(misses, new_vectors))
+        embeddings = [vectors[text] for text in texts]
+        for start in range(0, len(ids), self.MAX_BATCH_SIZE):
+            end = start + self.MAX_BATCH_SIZE
+            self._upsert(ids[start:end], embeddings[start:end], texts[start:end], metadatas[start:end])
+
+    def _upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[Optional[Dict[str, Any]]]
+    ):
+        # Same upsert add_texts() issues, minus its per-call embedding
+        self.db._collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
 
     def delete_document(self, doc_id: str):
         """Delete a document from the vector store."""
@@ -47,21 +304,62 @@ class VectorDatabase:
         except ValueError:
             pass
 
-    def search(self, query: str, top_k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str, float, Dict[str, Any]]]:
+    @functools.cached_property
+    def embedding_dim(self) -> int:
+        """Length of the vectors the model produces (and the collection holds)."""
+        return len(self.embed_query(""))
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query, batched with any concurrent queries.
+        
+        Embeddings of the last QUERY_CACHE_SIZE distinct normalized queries
+        are cached for the whole process (every VectorDatabase on the same
+        model shares them), so repeated queries skip the model entirely.
+        """
+        return list(_cached_query_embedding(self.batcher, normalize_query(query)))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        embedding: Optional[List[float]] = None
+    ) -> List[Tuple[str, str, float, Dict[str, Any]]]:
         """
         Search for documents similar to the query.
         Returns: List of (id, text, score, metadata)
+        
+        A precomputed query embedding, when given, is used as-is instead of
+        embedding the query text. It must have embedding_dim components, or
+        ValueError is raised.
+        
+        On cosine collections the score is the cosine similarity (clamped
+        at 0); on older L2 collections it is 1 / (1 + distance).
         """
-        results = self.db.similarity_search_with_score(query, k=top_k, filter=filter)
+        if embedding is not None and len(embedding) != self.embedding_dim:
+            raise ValueError(
+                f"embedding has {len(embedding)} dimensions, expected {self.embedding_dim}"
+            )
+        cosine = self.distance_space == "cosine"
+        # Queried on the collection directly: IDs come back as Chroma's own
+        # record IDs, with no LangChain Document built per hit
+        result = self.db._collection.query(
+            query_embeddings=[embedding if embedding is not None else self.embed_query(query)],
+            n_results=top_k,
+            where=filter or None,
+            include=["documents", "metadatas", "distances"]
+        )
         formatted_results = []
-        for doc, score in results:
-            similarity = 1.0 / (1.0 + score)
-            doc_id = doc.metadata.get('id')
-            formatted_results.append((doc_id, doc.page_content, similarity, doc.metadata))
+        for doc_id, text, distance, metadata in zip(
+            result["ids"][0], result["documents"][0], result["distances"][0], result["metadatas"][0]
+        ):
+            similarity = max(0.0, 1.0 - distance) if cosine else 1.0 / (1.0 + distance)
+            formatted_results.append((doc_id, text, similarity, metadata or {}))
             
         return formatted_results
 
-    def update_document(self, doc_id: str, text: str, metadata: Dict[str, Any]):
+    def update_document(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]]):
         """Update a document. In Chroma, adding with same ID overwrites."""
         self.add_document(doc_id, text, metadata)
 
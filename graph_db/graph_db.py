@@ -5,13 +5,73 @@ Provides CRUD operations, traversal, scoring, and persistence for graph data.
 """
 
 import json
+import threading
 import networkx as nx
-from collections import deque
-from typing import Optional, Dict, List, Any
+import numpy as np
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+from typing import Optional, Dict, List, Any, Tuple
 from pathlib import Path
 
 from graph_db.models import GraphNode, GraphRelationship
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """
+    Write data as indented UTF-8 JSON, using orjson when available.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    """
+    Read a JSON document, using orjson when available.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalise each row of a float matrix, leaving zero rows untouched.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _frontier_edges(indptr: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the CSR positions of every edge leaving a BFS frontier.
+    
+    Returns:
+        Tuple of (positions, counts): edge positions in frontier order, and
+        the number of edges contributed by each frontier node
+    """
+    row_starts = indptr[frontier]
+    counts = indptr[frontier + 1] - row_starts
+    total = int(counts.sum())
+    positions = np.repeat(row_starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+    return positions, counts
+
 
 class GraphDatabase:
     """
@@ -25,6 +85,15 @@ class GraphDatabase:
         - JSON persistence
     """
     
+    # Maximum number of (start_id, depth) entries kept by the score cache
+    SCORE_CACHE_SIZE = 4096
+    
+    # Rows dequantized at a time by quantized embedding search
+    QUANTIZED_BLOCK_ROWS = 4096
+    
+    # Quantized search rescores this many candidates per result in float32
+    QUANTIZED_RESCORE_FACTOR = 4
+    
     def __init__(self, db_path: str = "db/graph_data.json", auto_persist: bool = True):
         """
         Initialize graph database.
@@ -37,6 +106,17 @@ class GraphDatabase:
         self._edge_id_map: Dict[str, tuple] = {}  # edge_id -> (source, target, key)
         self.db_path = db_path
         self.auto_persist = auto_persist
+        self._score_cache: OrderedDict = OrderedDict()  # (start_id, depth) -> scores
+        self._index_cache: Optional[Tuple] = None  # (node_ids, id_to_index)
+        self._neighbors_cache: Optional[List[Tuple[int, ...]]] = None  # undirected, by node index
+        self._csr_cache: Dict[bool, Tuple] = {}  # directed -> (indptr, indices, weights)
+        self._csr_types_cache: Optional[np.ndarray] = None  # edge types, directed CSR order
+        self._stats_cache: Optional[Dict[str, int]] = None
+        self._embedding_index: Optional[Dict[int, Tuple]] = None  # dim -> (matrix, row_ids)
+        self._quantized_index: Dict[int, np.ndarray] = {}  # dim -> int8 codes
+        # Readers run concurrently, so the LRU reorder and the lazy cache
+        # builds are serialised; writers hold the caller's write lock
+        self._cache_lock = threading.RLock()
         
         # Auto-load if file exists
         if auto_persist and Path(db_path).exists():
@@ -88,8 +168,7 @@ class GraphDatabase:
         
         # Write to file
         Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _write_json(path, data)
     
     def load(self, path: Optional[str] = None) -> None:
         """
@@ -104,12 +183,12 @@ class GraphDatabase:
         """
         if path is None:
             path = self.db_path
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _read_json(path)
         
         # Clear existing graph
         self.graph.clear()
         self._edge_id_map.clear()
+        self._invalidate_caches()
         
         # Load nodes
         for node_data in data.get("nodes", []):
@@ -141,6 +220,176 @@ class GraphDatabase:
         """
         self.save()
     
+    @contextmanager
+    def batch(self):
+        """
+        Group writes so the graph is saved once, when the block exits.
+        
+        auto_persist is suspended inside the block. Nested batches save
+        only at the outermost exit, and nothing is saved when auto_persist
+        is off.
+        
+        Example:
+            with db.batch():
+                for text in texts:
+                    db.create_node(text)
+        """
+        auto_persist = self.auto_persist
+        self.auto_persist = False
+        try:
+            yield self
+        finally:
+            self.auto_persist = auto_persist
+            if auto_persist:
+                self.persist()
+    
+    def _invalidate_caches(
+        self,
+        embeddings: bool = True,
+        edges: bool = True,
+        nodes: bool = True
+    ) -> None:
+        """
+        Drop cached query results after the graph has been mutated.
+        
+        Code that edits self.graph directly must call this afterwards.
+        
+        Args:
+            embeddings: Also drop the embedding matrix (skip when the
+                mutation cannot have changed any node embedding)
+            edges: Drop the adjacency and everything derived from it (skip
+                when no edge, and no node with edges, was added or removed)
+            nodes: Drop the node index (skip when no node was removed;
+                nodes appended with _append_to_index() keep it valid)
+        """
+        if nodes:
+            self._index_cache = None
+            edges = True  # Everything below is keyed by node index
+        if edges:
+            self._score_cache.clear()
+            self._csr_cache = {}
+            self._csr_types_cache = None
+            self._neighbors_cache = None
+            self._stats_cache = None
+        if embeddings:
+            self._embedding_index = None
+            self._quantized_index = {}
+    
+    def _append_to_index(self, node_ids: List[str]) -> None:
+        """
+        Extend the cached index and adjacency with newly added nodes.
+        
+        The nodes must be new and have no edges yet. networkx keeps nodes
+        in insertion order, so they take the next integer indices and every
+        existing index, CSR row and cached score stays valid.
+        """
+        if not node_ids:
+            return
+        self._stats_cache = None
+        if self._index_cache is None:
+            return  # Built from scratch on next use
+        
+        index_ids, id_to_index = self._index_cache
+        for node_id in node_ids:
+            id_to_index[node_id] = len(index_ids)
+            index_ids.append(node_id)
+        # Edge-less rows: repeat the end offset once per new node
+        for directed, (indptr, indices, weights) in self._csr_cache.items():
+            indptr = np.concatenate([indptr, np.full(len(node_ids), indptr[-1], dtype=indptr.dtype)])
+            self._csr_cache[directed] = (indptr, indices, weights)
+        if self._neighbors_cache is not None:
+            self._neighbors_cache.extend(() for _ in node_ids)
+    
+    def _get_index(self) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Get the integer view of the graph's nodes used by traversals.
+        
+        Node IDs are mapped to dense integers. Built lazily, extended in
+        place when nodes are added and rebuilt after a node is removed.
+        
+        Returns:
+            Tuple of (node_ids, id_to_index)
+        """
+        with self._cache_lock:
+            if self._index_cache is None:
+                node_ids = list(self.graph.nodes)
+                id_to_index = {node_id: ix for ix, node_id in enumerate(node_ids)}
+                self._index_cache = (node_ids, id_to_index)
+            return self._index_cache
+    
+    def _get_neighbors(self) -> List[Tuple[int, ...]]:
+        """
+        Get each node's undirected neighbourhood as a tuple of node indices.
+        
+        Only traverse_ints() walks these; the array-based traversals use
+        the CSR instead. Built lazily and reused until edges change.
+        """
+        with self._cache_lock:
+            if self._neighbors_cache is None:
+                id_to_index = self._get_index()[1]
+                self._neighbors_cache = [
+                    tuple({
+                        id_to_index[neighbor]
+                        for neighbor in chain(self.graph.successors(node_id), self.graph.predecessors(node_id))
+                    })
+                    for node_id in self._get_index()[0]
+                ]
+            return self._neighbors_cache
+    
+    def _get_csr(self, directed: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the weighted adjacency of the graph in CSR form.
+        
+        Rows and columns use the integer indices of _get_index(), and
+        parallel edges are kept as separate entries. Undirected, every edge
+        appears once under its source and once under its target; directed,
+        only under its source (in successor order). Built lazily, reused
+        until edges change and extended in place when nodes are added.
+        
+        Args:
+            directed: Only follow edges from source to target
+            
+        Returns:
+            Tuple of (indptr, indices, weights) arrays
+        """
+        with self._cache_lock:
+            if directed not in self._csr_cache:
+                id_to_index = self._get_index()[1]
+                n = len(id_to_index)
+                edges = self.graph.edges(data="weight", default=1.0)
+                sources = np.fromiter((id_to_index[u] for u, _, _ in edges), dtype=np.int64)
+                targets = np.fromiter((id_to_index[v] for _, v, _ in edges), dtype=np.int64)
+                edge_weights = np.fromiter((w for _, _, w in edges), dtype=np.float64)
+                
+                if directed:
+                    heads, tails, weights = sources, targets, edge_weights
+                else:
+                    heads = np.concatenate([sources, targets])
+                    tails = np.concatenate([targets, sources])
+                    weights = np.concatenate([edge_weights, edge_weights])
+                order = np.argsort(heads, kind="stable")
+                indptr = np.zeros(n + 1, dtype=np.int64)
+                np.cumsum(np.bincount(heads, minlength=n), out=indptr[1:])
+                self._csr_cache[directed] = (indptr, tails[order], weights[order])
+            return self._csr_cache[directed]
+    
+    def _get_csr_edge_types(self) -> np.ndarray:
+        """
+        Get the relationship type of every entry of the directed CSR.
+        
+        Returns:
+            Object array aligned with the indices of _get_csr(directed=True)
+        """
+        with self._cache_lock:
+            if self._csr_types_cache is None:
+                id_to_index = self._get_index()[1]
+                edges = list(self.graph.edges(data="type"))
+                sources = np.fromiter((id_to_index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+                edge_types = np.empty(len(edges), dtype=object)
+                edge_types[:] = [rel_type for _, _, rel_type in edges]
+                self._csr_types_cache = edge_types[np.argsort(sources, kind="stable")]
+            return self._csr_types_cache
+    
     # ==================== Node CRUD ====================
     
     def create_node(
@@ -163,16 +412,60 @@ class GraphDatabase:
             Created GraphNode
         """
         node = GraphNode(text=text, metadata=metadata, embedding=embedding, node_id=node_id)
+        replaced = node.id in self.graph
         self.graph.add_node(
             node.id,
             text=node.text,
             metadata=node.metadata,
             embedding=node.embedding
         )
+        # A fresh node is appended to the index and embedding matrix in
+        # place; overwriting an existing one only changes its attributes,
+        # but forces an embedding rebuild.
+        self._invalidate_caches(embeddings=replaced, edges=False, nodes=False)
+        if not replaced:
+            self._append_to_index([node.id])
+            self._append_embedding(node.id, node.embedding)
         if self.auto_persist:
             self.persist()
         return node
     
+    def create_nodes_bulk(self, nodes: List[Dict[str, Any]]) -> List[GraphNode]:
+        """
+        Create many nodes with a single graph insert and one persist.
+        
+        Args:
+            nodes: List of dicts holding create_node() keyword arguments
+                (text, and optionally metadata, embedding, node_id)
+            
+        Returns:
+            List of created GraphNodes, in input order
+        """
+        created = [
+            GraphNode(
+                text=node["text"],
+                metadata=node.get("metadata"),
+                embedding=node.get("embedding"),
+                node_id=node.get("node_id")
+            )
+            for node in nodes
+        ]
+        new_ids = [node_id for node_id in dict.fromkeys(node.id for node in created) if node_id not in self.graph]
+        replaced = len(new_ids) < len(created)
+        
+        self.graph.add_nodes_from(
+            (node.id, {"text": node.text, "metadata": node.metadata, "embedding": node.embedding})
+            for node in created
+        )
+        self._invalidate_caches(embeddings=replaced, edges=False, nodes=False)
+        self._append_to_index(new_ids)
+        if not replaced:
+            for node in created:
+                self._append_embedding(node.id, node.embedding)
+        if self.auto_persist:
+            self.persist()
+        return created
+    
     def get_node(self, node_id: str) -> Optional[GraphNode]:
         """
         Get node by ID.
@@ -194,6 +487,29 @@ class GraphDatabase:
             node_id=node_id
         )
     
+    def get_nodes(self, node_ids: List[str]) -> Dict[str, GraphNode]:
+        """
+        Get many nodes by ID in one call.
+        
+        Args:
+            node_ids: Node identifiers
+            
+        Returns:
+            Dictionary mapping node_id to GraphNode, in the order given;
+            IDs that don't exist are left out
+        """
+        nodes = self.graph.nodes
+        return {
+            node_id: GraphNode(
+                text=node_data["text"],
+                metadata=node_data["metadata"],
+                embedding=node_data.get("embedding"),
+                node_id=node_id
+            )
+            for node_id, node_data in ((node_id, nodes.get(node_id)) for node_id in node_ids)
+            if node_data is not None
+        }
+    
     def update_node(
         self,
         node_id: str,
@@ -225,6 +541,8 @@ class GraphDatabase:
         if embedding is not None:
             self.graph.nodes[node_id]["embedding"] = embedding
         
+        # Attributes only: the index and adjacency stay valid
+        self._invalidate_caches(embeddings=embedding is not None, edges=False, nodes=False)
         if self.auto_persist:
             self.persist()
         return True
@@ -242,17 +560,18 @@ class GraphDatabase:
         if node_id not in self.graph.nodes:
             return False
         
-        # Remove edge mappings
-        edges_to_remove = []
-        for edge_id, (source, target, key) in self._edge_id_map.items():
-            if source == node_id or target == node_id:
-                edges_to_remove.append(edge_id)
-        
-        for edge_id in edges_to_remove:
-            del self._edge_id_map[edge_id]
+        # Remove edge mappings. The graph's adjacency already lists the
+        # node's edges, so this is O(degree) rather than a scan of all edges
+        # (self-loops show up on both sides, hence pop with a default).
+        for _, _, edge_id in chain(
+            self.graph.out_edges(node_id, data="id"),
+            self.graph.in_edges(node_id, data="id")
+        ):
+            self._edge_id_map.pop(edge_id, None)
         
         # Remove node (automatically removes edges)
         self.graph.remove_node(node_id)
+        self._invalidate_caches()
         if self.auto_persist:
             self.persist()
         return True
@@ -297,10 +616,49 @@ class GraphDatabase:
         )
         
         self._edge_id_map[edge.id] = (source_id, target_id, key)
+        self._invalidate_caches(embeddings=False, nodes=False)
         if self.auto_persist:
             self.persist()
         return edge
     
+    def create_edges_bulk(
+        self,
+        edges: List[Tuple[str, str, str, float]]
+    ) -> List[Optional[GraphRelationship]]:
+        """
+        Create many edges with a single graph insert and one persist.
+        
+        Args:
+            edges: List of (source_id, target_id, rel_type, weight) tuples
+            
+        Returns:
+            List aligned with edges: the created GraphRelationship, or None
+            where the source or target node doesn't exist
+        """
+        nodes = self.graph.nodes
+        created: List[Optional[GraphRelationship]] = []
+        for source_id, target_id, rel_type, weight in edges:
+            if source_id in nodes and target_id in nodes:
+                created.append(GraphRelationship(source_id, target_id, rel_type, weight))
+            else:
+                created.append(None)
+        
+        valid = [edge for edge in created if edge is not None]
+        if not valid:
+            return created
+        
+        keys = self.graph.add_edges_from(
+            (edge.source, edge.target, {"id": edge.id, "type": edge.type, "weight": edge.weight})
+            for edge in valid
+        )
+        for edge, key in zip(valid, keys):
+            self._edge_id_map[edge.id] = (edge.source, edge.target, key)
+        
+        self._invalidate_caches(embeddings=False, nodes=False)
+        if self.auto_persist:
+            self.persist()
+        return created
+    
     def get_edge(self, edge_id: str) -> Optional[GraphRelationship]:
         """
         Get edge by ID.
@@ -341,6 +699,41 @@ class GraphDatabase:
         source, target, key = self._edge_id_map[edge_id]
         self.graph.remove_edge(source, target, key)
         del self._edge_id_map[edge_id]
+        self._invalidate_caches(embeddings=False, nodes=False)
+        if self.auto_persist:
+            self.persist()
+        return True
+    
+    def update_edge(
+        self,
+        edge_id: str,
+        rel_type: Optional[str] = None,
+        weight: Optional[float] = None
+    ) -> bool:
+        """
+        Update edge attributes.
+        
+        Args:
+            edge_id: Edge identifier
+            rel_type: New relationship type (optional)
+            weight: New edge weight (optional)
+            
+        Returns:
+            True if updated, False if edge doesn't exist
+        """
+        if edge_id not in self._edge_id_map:
+            return False
+        
+        source, target, key = self._edge_id_map[edge_id]
+        edge_data = self.graph[source][target][key]
+        
+        if rel_type is not None:
+            edge_data["type"] = rel_type
+        
+        if weight is not None:
+            edge_data["weight"] = weight
+        
+        self._invalidate_caches(embeddings=False, nodes=False)
         if self.auto_persist:
             self.persist()
         return True
@@ -358,32 +751,58 @@ class GraphDatabase:
         Returns:
             List of node IDs reachable within depth
         """
-        if start_id not in self.graph.nodes:
-            return []
+        node_ids = self._get_index()[0]
+        return [node_ids[ix] for ix in self.traverse_ints(start_id, depth)]
+    
+    def traverse_ints(self, start_id: str, depth: int) -> array:
+        """
+        Traverse graph using BFS, returning dense integer node indices.
         
-        visited = set()
-        result = []
-        queue = deque([(start_id, 0)])  # (node_id, current_depth)
+        Visited nodes are tracked in a bytearray bitmap rather than a set of
+        string IDs. Indices are positions in node_ids() and stay valid until
+        a node is next removed.
         
-        while queue:
-            node_id, current_depth = queue.popleft()
-            
-            if node_id in visited:
-                continue
-            
-            visited.add(node_id)
-            result.append(node_id)
+        Args:
+            start_id: Starting node ID
+            depth: Maximum traversal depth
             
-            # Only explore neighbors if we haven't reached max depth
-            if current_depth < depth:
-                # Get both outgoing and incoming neighbors (for directed graph)
-                neighbors = set(self.graph.successors(node_id)) | set(self.graph.predecessors(node_id))
-                for neighbor in neighbors:
-                    if neighbor not in visited:
-                        queue.append((neighbor, current_depth + 1))
+        Returns:
+            array('I') of node indices reachable within depth, in BFS order
+        """
+        node_ids, id_to_index = self._get_index()
+        neighbors = self._get_neighbors()
+        start = id_to_index.get(start_id)
+        if start is None:
+            return array('I')
+        
+        visited = bytearray(len(node_ids))
+        visited[start] = 1
+        result = array('I', [start])
+        frontier = [start]
+        
+        for _ in range(depth):
+            next_frontier = []
+            for ix in frontier:
+                for neighbor in neighbors[ix]:
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            result.extend(next_frontier)
+            frontier = next_frontier
         
         return result
     
+    def node_ids(self) -> List[str]:
+        """
+        Get node IDs ordered by their integer index.
+        
+        Returns:
+            List where position i holds the ID of node index i
+        """
+        return self._get_index()[0]
+    
     def compute_graph_scores(
         self,
         start_id: str,
@@ -394,6 +813,8 @@ class GraphDatabase:
         
         Score formula: (total_edge_weight) / (hop_distance + 1)
         
+        Results are memoized per (start_id, depth) until the graph is mutated.
+        
         Args:
             start_id: Starting node ID
             depth: Maximum traversal depth
@@ -404,63 +825,415 @@ class GraphDatabase:
         if start_id not in self.graph.nodes:
             return {}
         
-        scores = {}
-        queue = deque([(start_id, 0, 0)])  # (node_id, hop_distance, accumulated_weight)
-        visited = {}  # node_id -> (min_distance, max_weight)
+        key = (start_id, depth)
+        scores = self._cached_score(key)
+        if scores is None:
+            scores = self._bfs_scores(start_id, depth)
+            self._cache_score(key, scores)
+        
+        # Hand out a copy so callers can't corrupt the cached entry
+        return dict(scores)
+    
+    def _cached_score(self, key: Tuple) -> Any:
+        """
+        Look up a score cache entry, marking it most recently used.
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._cache_lock:
+            value = self._score_cache.get(key)
+            if value is not None:
+                self._score_cache.move_to_end(key)
+            return value
+    
+    def _cache_score(self, key: Tuple, value: Any) -> None:
+        """
+        Store a score cache entry, evicting the least recently used one.
+        """
+        with self._cache_lock:
+            self._score_cache[key] = value
+            if len(self._score_cache) > self.SCORE_CACHE_SIZE:
+                self._score_cache.popitem(last=False)
+    
+    def compute_graph_scores_array(self, start_id: str, depth: int) -> np.ndarray:
+        """
+        Compute graph-based relevance scores as a dense array.
+        
+        Same scores as compute_graph_scores(), laid out by node index
+        (see node_ids()) with 0.0 for nodes that aren't reachable.
+        Not memoized.
         
-        while queue:
-            node_id, hop_distance, accumulated_weight = queue.popleft()
+        Args:
+            start_id: Starting node ID
+            depth: Maximum traversal depth
             
-            # Skip if we've exceeded max depth
-            if hop_distance > depth:
-                continue
+        Returns:
+            float64 array of length len(node_ids()), empty if start_id
+            doesn't exist
+        """
+        start = self._get_index()[1].get(start_id)
+        if start is None:
+            return np.zeros(0)
+        
+        levels, accumulated = self._score_levels(start, depth)
+        scores = np.zeros(len(accumulated))
+        scores[start] = float('inf')
+        for hop in range(1, len(levels)):
+            scores[levels[hop]] = accumulated[levels[hop]] / hop
+        return scores
+    
+    def multi_source_hops(
+        self,
+        start_ids: List[str],
+        depth: int,
+        directed: bool = False
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Hop distance from the nearest of several start nodes, in one BFS.
+        
+        Start IDs that don't exist are ignored. Runs level by level over
+        the CSR adjacency, expanding each level with array operations.
+        Results are memoized per (start nodes, depth, directed) in the score
+        cache until the graph is mutated.
+        
+        Args:
+            start_ids: Starting node IDs (hop 0)
+            depth: Maximum traversal depth
+            directed: Only follow edges from source to target
             
-            # Update visited tracking
-            if node_id not in visited:
-                visited[node_id] = (hop_distance, accumulated_weight)
-            else:
-                prev_distance, prev_weight = visited[node_id]
-                # Keep the path with shorter distance or higher weight
-                if hop_distance < prev_distance or (hop_distance == prev_distance and accumulated_weight > prev_weight):
-                    visited[node_id] = (hop_distance, accumulated_weight)
-                else:
-                    continue  # Skip this path
+        Returns:
+            Tuple of (node_ids, hops): reached node IDs in BFS order (start
+            nodes first, in the order given) and their hop distances
+        """
+        node_ids, id_to_index = self._get_index()
+        starts = [id_to_index[node_id] for node_id in dict.fromkeys(start_ids) if node_id in id_to_index]
+        if not starts:
+            return [], np.zeros(0, dtype=np.int64)
+        
+        key = ("hops", tuple(starts), depth, directed)
+        cached = self._cached_score(key)
+        if cached is None:
+            cached = self._multi_source_levels(starts, depth, directed)
+            self._cache_score(key, cached)
+        
+        # Hand out copies so callers can't corrupt the cached entry
+        reached_ids, hops = cached
+        return list(reached_ids), hops.copy()
+    
+    def _multi_source_levels(
+        self,
+        starts: List[int],
+        depth: int,
+        directed: bool
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Run the level-by-level BFS behind multi_source_hops().
+        
+        Args:
+            starts: Distinct start node indices (must exist)
+            depth: Maximum traversal depth
+            directed: Only follow edges from source to target
             
-            # Calculate score for this node
-            if hop_distance == 0:
-                scores[node_id] = float('inf')  # Starting node has infinite relevance
-            else:
-                scores[node_id] = accumulated_weight / hop_distance
+        Returns:
+            Tuple of (node_ids, hops), as for multi_source_hops()
+        """
+        node_ids = self._get_index()[0]
+        indptr, indices, _ = self._get_csr(directed)
+        reached = np.zeros(len(node_ids), dtype=bool)
+        frontier = np.array(starts, dtype=np.int64)
+        reached[frontier] = True
+        levels = [frontier]
+        
+        for _ in range(depth):
+            positions, _ = _frontier_edges(indptr, frontier)
+            targets = indices[positions]
+            targets = targets[~reached[targets]]
+            if not len(targets):
+                break
+            unique_targets, first_seen = np.unique(targets, return_index=True)
+            frontier = unique_targets[np.argsort(first_seen)]
+            reached[frontier] = True
+            levels.append(frontier)
+        
+        order = np.concatenate(levels)
+        hops = np.repeat(np.arange(len(levels)), [len(level) for level in levels])
+        return [node_ids[ix] for ix in order.tolist()], hops
+    
+    def traverse_tree(
+        self,
+        start_id: str,
+        depth: int,
+        rel_type: Optional[str] = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, List[Optional[Tuple[Any, float]]]]:
+        """
+        BFS tree over outgoing edges, with the edge that reached each node.
+        
+        Each node is reached through its first qualifying edge: edges are
+        taken in queue order of their source and adjacency order within it,
+        exactly as a queue-based BFS that follows one edge per new neighbour.
+        Levels are expanded with array operations over the CSR adjacency.
+        
+        Args:
+            start_id: Starting node ID
+            depth: Maximum traversal depth
+            rel_type: Only follow relationships of this type (optional)
             
-            # Explore neighbors if within depth
-            if hop_distance < depth:
-                # Outgoing edges
-                for neighbor in self.graph.successors(node_id):
-                    for key, edge_data in self.graph[node_id][neighbor].items():
-                        new_weight = accumulated_weight + edge_data.get("weight", 1.0)
-                        queue.append((neighbor, hop_distance + 1, new_weight))
-                
-                # Incoming edges
-                for neighbor in self.graph.predecessors(node_id):
-                    for key, edge_data in self.graph[neighbor][node_id].items():
-                        new_weight = accumulated_weight + edge_data.get("weight", 1.0)
-                        queue.append((neighbor, hop_distance + 1, new_weight))
+        Returns:
+            Tuple of (node_ids, hops, parents, edges): reached node IDs in
+            BFS order, start node first (empty if it doesn't exist); their
+            hop distances; the position in node_ids of each node's parent
+            (-1 for the start node); and the (type, weight) of the edge that
+            reached each node (None for the start node)
+        """
+        node_ids, id_to_index = self._get_index()
+        start = id_to_index.get(start_id)
+        if start is None:
+            return [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), []
         
+        indptr, indices, weights = self._get_csr(directed=True)
+        edge_types = self._get_csr_edge_types()
+        reached = np.zeros(len(node_ids), dtype=bool)
+        reached[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        levels = [frontier]
+        level_parents = [np.array([-1], dtype=np.int64)]
+        level_edges = []
+        offset = 0  # position of the frontier's first node in the output
+        
+        for _ in range(depth):
+            positions, counts = _frontier_edges(indptr, frontier)
+            sources = np.repeat(np.arange(offset, offset + len(frontier)), counts)
+            if rel_type is not None:
+                matching = edge_types[positions] == rel_type
+                positions, sources = positions[matching], sources[matching]
+            fresh = ~reached[indices[positions]]
+            positions, sources = positions[fresh], sources[fresh]
+            if not len(positions):
+                break
+            
+            # The first edge to each new node claims it
+            _, first = np.unique(indices[positions], return_index=True)
+            first.sort()
+            offset += len(frontier)
+            frontier = indices[positions[first]]
+            reached[frontier] = True
+            levels.append(frontier)
+            level_parents.append(sources[first])
+            level_edges.append(positions[first])
+        
+        order = np.concatenate(levels)
+        hops = np.repeat(np.arange(len(levels)), [len(level) for level in levels])
+        tree_edges = np.concatenate(level_edges) if level_edges else np.zeros(0, dtype=np.int64)
+        edges = [None]
+        edges.extend(zip(edge_types[tree_edges].tolist(), weights[tree_edges].tolist()))
+        return [node_ids[ix] for ix in order.tolist()], hops, np.concatenate(level_parents), edges
+    
+    def _bfs_scores(self, start_id: str, depth: int) -> Dict[str, float]:
+        """
+        Run the weighted BFS behind compute_graph_scores().
+        
+        Args:
+            start_id: Starting node ID (must exist)
+            depth: Maximum traversal depth
+            
+        Returns:
+            Dictionary mapping node_id to relevance score, in BFS order
+        """
+        node_ids, id_to_index = self._get_index()
+        start = id_to_index[start_id]
+        levels, accumulated = self._score_levels(start, depth)
+        
+        scores = {start_id: float('inf')}  # Starting node has infinite relevance
+        for hop in range(1, len(levels)):
+            level = levels[hop]
+            scores.update(zip(
+                [node_ids[ix] for ix in level.tolist()],
+                (accumulated[level] / hop).tolist()
+            ))
         return scores
     
+    def _score_levels(self, start: int, depth: int) -> Tuple[List[np.ndarray], np.ndarray]:
+        """
+        Level-synchronous weighted BFS over the CSR adjacency.
+        
+        Each node is reached at its shortest hop distance and keeps the
+        largest accumulated edge weight over all shortest paths to it.
+        A whole BFS level is expanded with vectorized array operations
+        instead of one queue entry per edge.
+        
+        Args:
+            start: Starting node index
+            depth: Maximum traversal depth
+            
+        Returns:
+            Tuple of (levels, accumulated): levels[h] holds the node indices
+            first reached at hop h in discovery order, and accumulated holds
+            each reached node's path weight (-inf where unreached)
+        """
+        indptr, indices, weights = self._get_csr()
+        reached = np.zeros(len(indptr) - 1, dtype=bool)
+        accumulated = np.full(len(indptr) - 1, -np.inf)
+        reached[start] = True
+        accumulated[start] = 0.0
+        frontier = np.array([start], dtype=np.int64)
+        levels = [frontier]
+        
+        for _ in range(depth):
+            positions, counts = _frontier_edges(indptr, frontier)
+            if not len(positions):
+                break
+            
+            targets = indices[positions]
+            fresh = ~reached[targets]
+            if not fresh.any():
+                break
+            targets = targets[fresh]
+            candidates = (np.repeat(accumulated[frontier], counts) + weights[positions])[fresh]
+            np.maximum.at(accumulated, targets, candidates)
+            
+            unique_targets, first_seen = np.unique(targets, return_index=True)
+            frontier = unique_targets[np.argsort(first_seen)]
+            reached[frontier] = True
+            levels.append(frontier)
+        
+        return levels, accumulated
+    
+    # ==================== Embedding Search ====================
+    
+    def search_by_embedding(
+        self,
+        query_embedding: List[float],
+        top_k: int = 10,
+        quantized: bool = False
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank nodes by cosine similarity to a query embedding.
+        
+        Node embeddings are kept as one L2-normalised float32 matrix per
+        dimension, so a search is a single matrix-vector product. Only nodes
+        whose embedding has the same dimension as the query are considered.
+        
+        With quantized=True the full scan reads an int8 copy of the rows
+        (1 byte per component instead of 4), then the best
+        top_k * QUANTIZED_RESCORE_FACTOR candidates are rescored in float32.
+        Returned scores are exact; only the shortlist is approximate.
+        
+        Args:
+            query_embedding: Query vector
+            top_k: Maximum number of results
+            quantized: Score against int8-quantized embeddings
+            
+        Returns:
+            List of (node_id, cosine_similarity) tuples, best match first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        entry = self._get_embedding_index().get(query.shape[0])
+        norm = float(np.linalg.norm(query))
+        if entry is None or top_k <= 0 or norm == 0.0:
+            return []
+        
+        matrix, row_ids = entry
+        query = query / norm
+        if quantized:
+            codes = self._get_quantized(query.shape[0])
+            sims = np.empty(len(row_ids), dtype=np.float32)
+            for start in range(0, len(row_ids), self.QUANTIZED_BLOCK_ROWS):
+                block = codes[start:start + self.QUANTIZED_BLOCK_ROWS]
+                sims[start:start + len(block)] = block.astype(np.float32) @ query
+            # Shortlist on the int8 scores, then rank it on the float32 rows
+            n = min(top_k * self.QUANTIZED_RESCORE_FACTOR, len(row_ids))
+            rows = np.sort(np.argpartition(-sims, n - 1)[:n])
+            sims = matrix[rows] @ query
+        else:
+            rows = np.arange(len(row_ids))
+            sims = matrix[:len(row_ids)] @ query
+        
+        k = min(top_k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(row_ids[row], float(sims[ix])) for ix, row in zip(top.tolist(), rows[top].tolist())]
+    
+    def _get_embedding_index(self) -> Dict[int, Tuple[np.ndarray, List[str]]]:
+        """
+        Get the per-dimension embedding matrices, rebuilding them if needed.
+        
+        Returns:
+            Dictionary mapping dimension to (matrix, row_ids). Matrices may
+            have spare capacity; only the first len(row_ids) rows are valid.
+        """
+        with self._cache_lock:
+            if self._embedding_index is None:
+                grouped: Dict[int, Tuple[List[List[float]], List[str]]] = {}
+                for node_id, data in self.graph.nodes(data=True):
+                    embedding = data.get("embedding")
+                    if embedding is not None and len(embedding) > 0:
+                        rows, row_ids = grouped.setdefault(len(embedding), ([], []))
+                        rows.append(embedding)
+                        row_ids.append(node_id)
+                
+                self._embedding_index = {
+                    dim: (_normalize_rows(np.asarray(rows, dtype=np.float32)), row_ids)
+                    for dim, (rows, row_ids) in grouped.items()
+                }
+            return self._embedding_index
+    
+    def _get_quantized(self, dim: int) -> np.ndarray:
+        """
+        Get int8 codes for the normalised embeddings of one dimension.
+        
+        Rows are unit length, so a single global scale of 127 maps every
+        component into the int8 range. Re-quantized after appends.
+        """
+        with self._cache_lock:
+            matrix, row_ids = self._get_embedding_index()[dim]
+            codes = self._quantized_index.get(dim)
+            if codes is None or codes.shape[0] != len(row_ids):
+                codes = np.rint(matrix[:len(row_ids)] * 127.0).astype(np.int8)
+                self._quantized_index[dim] = codes
+            return codes
+    
+    def _append_embedding(self, node_id: str, embedding: Optional[List[float]]) -> None:
+        """
+        Append a new node's embedding to an already-built matrix.
+        
+        Capacity doubles when full so inserts stay amortised O(dim).
+        """
+        if self._embedding_index is None or embedding is None or len(embedding) == 0:
+            return  # Nothing to add, or the index will be rebuilt lazily
+        
+        row = _normalize_rows(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+        dim = row.shape[1]
+        matrix, row_ids = self._embedding_index.get(dim, (np.empty((0, dim), dtype=np.float32), []))
+        
+        if len(row_ids) == matrix.shape[0]:
+            grown = np.empty((max(16, 2 * matrix.shape[0]), dim), dtype=np.float32)
+            grown[:len(row_ids)] = matrix[:len(row_ids)]
+            matrix = grown
+        
+        matrix[len(row_ids)] = row[0]
+        row_ids.append(node_id)
+        self._embedding_index[dim] = (matrix, row_ids)
+    
     # ==================== Utility Methods ====================
     
     def get_stats(self) -> Dict[str, int]:
         """
         Get graph statistics.
         
+        Counted once and memoized until the next mutation (counting
+        MultiDiGraph edges walks every adjacency list).
+        
         Returns:
             Dictionary with node count and edge count
         """
-        return {
-            "nodes": self.graph.number_of_nodes(),
-            "edges": self.graph.number_of_edges()
-        }
+        with self._cache_lock:
+            if self._stats_cache is None:
+                self._stats_cache = {
+                    "nodes": self.graph.number_of_nodes(),
+                    "edges": self.graph.number_of_edges()
+                }
+            return dict(self._stats_cache)
     
     def __repr__(self) -> str:
         stats = self.get_stats()
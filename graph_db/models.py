@@ -21,6 +21,8 @@ class GraphNode:
         embedding (list[float] | None): Optional vector embedding
     """
     
+    __slots__ = ("id", "text", "metadata", "embedding")
+    
     def __init__(
         self,
         text: str,
@@ -90,6 +92,8 @@ class GraphRelationship:
         weight (float): Edge weight for scoring
     """
     
+    __slots__ = ("id", "source", "target", "type", "weight")
+    
     def __init__(
         self,
         source: str,
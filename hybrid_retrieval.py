@@ -8,12 +8,11 @@ and graph-based relevance scoring for enhanced retrieval.
 import os
 import json
 from typing import List, Dict, Any, Tuple
-from collections import defaultdict
+from collections import defaultdict, deque
 
 import networkx as nx
-from langchain_community.vectorstores import Chroma
+from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
-from sentence_transformers import SentenceTransformer
 
 from graph_db.graph_db import GraphDatabase
 
@@ -88,6 +87,30 @@ def vector_search(query: str, top_k: int = 5) -> List[Tuple[str, str, float]]:
 
 # ==================== 2. Graph Expansion & Scoring ====================
 
+def undirected_view(graph: nx.MultiDiGraph) -> nx.MultiGraph:
+    """
+    Undirected view of graph.
+    
+    Creating the view is O(1) and copies nothing, so it is made per call
+    rather than cached (a cache would keep dropped graphs alive). The view
+    is live, and neighbors() yields successors and predecessors together,
+    each once.
+    """
+    return graph.to_undirected(as_view=True)
+
+
+def _depth_score(depth: int) -> float:
+    """Relation score of a node at the given hop distance."""
+    if depth == 0:
+        return 1.0  # Starting node
+    elif depth == 1:
+        return 1.0  # Direct neighbors
+    elif depth == 2:
+        return 0.5  # 2-hop neighbors
+    else:
+        return 0.0  # Beyond depth
+
+
 def graph_score(graph: nx.MultiDiGraph, chunk_id: str, depth: int = GRAPH_DEPTH) -> Dict[str, float]:
     """
     Compute graph-based scores for nodes related to chunk_id.
@@ -109,40 +132,45 @@ def graph_score(graph: nx.MultiDiGraph, chunk_id: str, depth: int = GRAPH_DEPTH)
         - Graph nodes represent chunk IDs
         - Edges represent meaningful relationships (parent-child, topic-subtopic, etc.)
     """
-    if chunk_id not in graph.nodes:
-        return {}
+    return multi_source_graph_score(graph, [chunk_id], depth)
+
+
+def multi_source_graph_score(
+    graph: nx.MultiDiGraph,
+    chunk_ids: List[str],
+    depth: int = GRAPH_DEPTH
+) -> Dict[str, float]:
+    """
+    Graph scores for nodes related to any of several chunks, in one BFS.
     
-    scores = {}
-    visited = set()
-    queue = [(chunk_id, 0)]  # (node_id, current_depth)
+    Same as taking the max of graph_score() over every chunk_id: scores
+    only fall with distance, so each node is scored at its shortest hop
+    distance to the nearest chunk, and each node is expanded once.
     
-    while queue:
-        node_id, current_depth = queue.pop(0)
-        
-        if node_id in visited:
-            continue
-        
-        visited.add(node_id)
+    Args:
+        graph: NetworkX MultiDiGraph instance
+        chunk_ids: Starting chunk/node IDs (missing ones are ignored)
+        depth: Maximum traversal depth (default: 2)
         
-        # Assign score based on depth
-        if current_depth == 0:
-            scores[node_id] = 1.0  # Starting node
-        elif current_depth == 1:
-            scores[node_id] = 1.0  # Direct neighbors
-        elif current_depth == 2:
-            scores[node_id] = 0.5  # 2-hop neighbors
-        else:
-            scores[node_id] = 0.0  # Beyond depth
+    Returns:
+        Dictionary mapping related_chunk_id -> relation_score
+    """
+    neighbors = undirected_view(graph).neighbors
+    hops = {chunk_id: 0 for chunk_id in chunk_ids if chunk_id in graph.nodes}
+    queue = deque(hops)
+    
+    while queue:
+        node_id = queue.popleft()
+        current_depth = hops[node_id]
         
-        # Explore neighbors if within depth
+        # Explore neighbors (outgoing and incoming) if within depth
         if current_depth < depth:
-            # Get both outgoing and incoming neighbors
-            neighbors = set(graph.successors(node_id)) | set(graph.predecessors(node_id))
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    queue.append((neighbor, current_depth + 1))
+            for neighbor in neighbors(node_id):
+                if neighbor not in hops:
+                    hops[neighbor] = current_depth + 1
+                    queue.append(neighbor)
     
-    return scores
+    return {node_id: _depth_score(hop) for node_id, hop in hops.items()}
 
 
 # ==================== 3. Hybrid Scoring ====================
@@ -169,7 +197,8 @@ def hybrid_rank(
     
     # Add vector search results
     for chunk_id, chunk_text, cos_score in cosine_results:
-        if chunk_id not in chunk_data:
+        entry = chunk_data.get(chunk_id)
+        if entry is None:
             chunk_data[chunk_id] = {
                 'chunk_id': chunk_id,
                 'text': chunk_text,
@@ -177,27 +206,29 @@ def hybrid_rank(
                 'graph_score': 0.0
             }
         else:
-            chunk_data[chunk_id]['cosine_similarity'] = max(
-                chunk_data[chunk_id]['cosine_similarity'], 
-                cos_score
-            )
+            entry['cosine_similarity'] = max(entry['cosine_similarity'], cos_score)
     
-    # Add graph expansion results
+    # Add graph expansion results: update vector hits in place, collect
+    # the graph-only nodes and add them in one pass afterwards
+    graph_only = []
     for chunk_id, g_score in graph_scores.items():
-        if chunk_id not in chunk_data:
-            # Node exists in graph but not in vector results
-            # Retrieve text from graph database
-            node = graph_db.get_node(chunk_id)
-            chunk_text = node.text if node else ""
-            
-            chunk_data[chunk_id] = {
-                'chunk_id': chunk_id,
-                'text': chunk_text,
-                'cosine_similarity': 0.0,
-                'graph_score': g_score
-            }
+        entry = chunk_data.get(chunk_id)
+        if entry is None:
+            graph_only.append((chunk_id, g_score))
         else:
-            chunk_data[chunk_id]['graph_score'] = g_score
+            entry['graph_score'] = g_score
+    
+    # Nodes not in the vector results: read their text straight from the
+    # graph's node data
+    graph_nodes = graph_db.graph.nodes
+    for chunk_id, g_score in graph_only:
+        node_data = graph_nodes.get(chunk_id)
+        chunk_data[chunk_id] = {
+            'chunk_id': chunk_id,
+            'text': node_data["text"] if node_data else "",
+            'cosine_similarity': 0.0,
+            'graph_score': g_score
+        }
     
     # Compute final scores
     final_results = []
@@ -230,7 +261,7 @@ def hybrid_retrieve(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     
     Process:
         1. Perform vector search to get top_k chunks
-        2. For each chunk, expand via graph to find related nodes
+        2. Expand all chunks via the graph (one BFS) to find related nodes
         3. Combine scores using hybrid ranking
         4. Return sorted results
     
@@ -244,22 +275,13 @@ def hybrid_retrieve(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     # Step 1: Vector search
     vector_results = vector_search(query, top_k)
     
-    # Step 2: Graph expansion
-    graph_scores_combined = {}
-    
-    for chunk_id, _, cos_score in vector_results:
-        # Get graph scores for this chunk
-        related_scores = graph_score(graph_db.graph, chunk_id, depth=GRAPH_DEPTH)
-        
-        # Merge scores (take max if chunk appears in multiple expansions)
-        for node_id, score in related_scores.items():
-            if node_id not in graph_scores_combined:
-                graph_scores_combined[node_id] = score
-            else:
-                graph_scores_combined[node_id] = max(
-                    graph_scores_combined[node_id], 
-                    score
-                )
+    # Step 2: Graph expansion (best score over all chunks' neighborhoods),
+    # one level-synchronous BFS over graph_db's cached CSR adjacency
+    reached_ids, hops = graph_db.multi_source_hops(
+        [chunk_id for chunk_id, _, _ in vector_results],
+        depth=GRAPH_DEPTH
+    )
+    graph_scores_combined = dict(zip(reached_ids, map(_depth_score, hops.tolist())))
     
     # Step 3: Hybrid ranking
     final_results = hybrid_rank(vector_results, graph_scores_combined)
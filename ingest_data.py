@@ -10,7 +10,7 @@ import uuid
 from typing import List, Dict
 
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+from langchain_chroma import Chroma
 from langchain.docstore.document import Document
 
 from graph_db.graph_db import GraphDatabase
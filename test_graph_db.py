@@ -49,6 +49,37 @@ def test_node_operations():
     assert deleted is None, "Node still exists after deletion"
     print(f" Deleted node successfully")
     
+    # Delete cascades to incoming, outgoing and self-loop edges only
+    hub = db.create_node("Hub", {})
+    other = db.create_node("Other", {})
+    removed = [
+        db.create_edge(hub.id, other.id, "out"),
+        db.create_edge(other.id, hub.id, "in"),
+        db.create_edge(hub.id, hub.id, "loop"),
+    ]
+    kept = db.create_edge(other.id, other.id, "kept")
+    assert db.delete_node(hub.id), "Node deletion failed"
+    assert all(db.get_edge(edge.id) is None for edge in removed), "Edge survived its node"
+    assert db.get_edge(kept.id) is not None, "Unrelated edge removed"
+    db.delete_node(other.id)
+    print(f" Deleted connected edges with the node")
+    
+    # Bulk create
+    created = db.create_nodes_bulk([
+        {"text": "Bulk 1", "node_id": "bulk-1", "embedding": [1.0, 0.0]},
+        {"text": "Bulk 2", "metadata": {"key": "value"}},
+    ])
+    assert created[0].id == "bulk-1", "Custom ID not kept"
+    assert db.get_node(created[1].id).metadata == {"key": "value"}, "Bulk node not retrievable"
+    assert db.search_by_embedding([1.0, 0.0], top_k=1)[0][0] == "bulk-1", "Bulk embedding not indexed"
+    print(f" Bulk created nodes")
+    
+    # Bulk get
+    fetched = db.get_nodes([created[1].id, "missing", "bulk-1"])
+    assert list(fetched) == [created[1].id, "bulk-1"], "Unexpected bulk get order"
+    assert fetched["bulk-1"].embedding == [1.0, 0.0], "Bulk get lost embedding"
+    print(f" Bulk fetched nodes")
+    
     return True
 
 
@@ -82,7 +113,19 @@ def test_edge_operations():
     deleted = db.get_edge(edge.id)
     assert deleted is None, "Edge still exists after deletion"
     print(f" Deleted edge successfully")
-    
+
+    # Bulk create, skipping edges with a missing endpoint
+    created = db.create_edges_bulk([
+        (n1.id, n2.id, "links_to", 1.0),
+        (n2.id, "missing", "links_to", 1.0),
+        (n2.id, n1.id, "links_back", 0.5),
+    ])
+    assert created[1] is None, "Edge to missing node should be skipped"
+    assert db.get_edge(created[2].id).weight == 0.5, "Bulk edge not retrievable"
+    assert db.delete_edge(created[0].id), "Bulk edge not registered"
+    assert db.graph.number_of_edges() == 1, "Unexpected edge count"
+    print(f" Bulk created edges")
+
     return True
 
 
@@ -110,6 +153,23 @@ def test_traversal():
     assert len(nodes_depth2) == 3, f"Expected 3 nodes at depth 2, got {len(nodes_depth2)}"
     print(f" Depth 2 traversal: {len(nodes_depth2)} nodes")
     
+    # Multi-source hops: directed only follows n1 -> n2 -> n3
+    reached, hops = db.multi_source_hops([n3.id, "missing", n2.id], depth=2, directed=True)
+    assert reached == [n3.id, n2.id], f"Unexpected directed reach {reached}"
+    reached, hops = db.multi_source_hops([n3.id], depth=2)
+    assert reached == [n3.id, n2.id, n1.id] and hops.tolist() == [0, 1, 2], "Unexpected undirected hops"
+    print(f" Multi-source hops: {len(reached)} nodes")
+    
+    # BFS tree: the first matching edge claims each node
+    db.create_edge(n1.id, n3.id, "skip", weight=4.0)
+    ids, hops, parents, edges = db.traverse_tree(n1.id, depth=2)
+    assert ids == [n1.id, n2.id, n3.id] and hops.tolist() == [0, 1, 1], "Unexpected tree"
+    assert edges[2] == ("skip", 4.0), f"Unexpected tree edge {edges[2]}"
+    ids, hops, parents, edges = db.traverse_tree(n1.id, depth=2, rel_type="next")
+    assert ids == [n1.id, n2.id, n3.id] and hops.tolist() == [0, 1, 2], "Unexpected filtered tree"
+    assert parents.tolist() == [-1, 0, 1] and edges[2] == ("next", 1.0), "Unexpected filtered path"
+    print(f" Traversal tree: {len(ids)} nodes")
+    
     return True
 
 
@@ -144,7 +204,104 @@ def test_scoring():
     
     print(f" Scoring works correctly")
     print(f"  Scores: {n1.id[:8]}=∞, {n2.id[:8]}={scores[n2.id]:.2f}, {n3.id[:8]}={scores[n3.id]:.2f}")
-    
+
+    # Two hops: n4 keeps the heavier of its two shortest paths, n5 is unreached
+    n4 = db.create_node("Second hop", {})
+    n5 = db.create_node("Isolated", {})
+    db.create_edge(n2.id, n4.id, "related", weight=1.0)
+    db.create_edge(n4.id, n3.id, "related", weight=1.0)
+    scores = db.compute_graph_scores(n1.id, depth=2)
+    assert scores[n4.id] == 2.0, "Expected best shortest-path weight / hops"
+    assert n5.id not in scores, "Unreachable node was scored"
+
+    dense = db.compute_graph_scores_array(n1.id, depth=2)
+    assert dict(zip(db.node_ids(), dense.tolist())) == {**scores, n5.id: 0.0}, "Dense scores differ"
+    print(f" Dense scores match")
+
+    return True
+
+
+def test_scoring_cache_invalidation():
+    """Test that cached scores are refreshed after the graph changes"""
+    print("\nTesting score cache invalidation...")
+    from graph_db import GraphDatabase
+
+    db = GraphDatabase(auto_persist=False)
+
+    n1 = db.create_node("Center", {})
+    n2 = db.create_node("Neighbor", {})
+    edge = db.create_edge(n1.id, n2.id, "related", weight=1.0)
+
+    scores = db.compute_graph_scores(n1.id, depth=1)
+    assert scores[n2.id] == 1.0, "Unexpected initial score"
+
+    # Mutating the returned dict must not leak into the cache
+    scores[n2.id] = 99.0
+    assert db.compute_graph_scores(n1.id, depth=1)[n2.id] == 1.0, "Cached scores were mutated"
+
+    # Updating the edge weight must invalidate the cached entry
+    assert db.update_edge(edge.id, weight=4.0), "Edge update failed"
+    assert db.get_edge(edge.id).weight == 4.0, "Weight not updated"
+    assert db.compute_graph_scores(n1.id, depth=1)[n2.id] == 4.0, "Stale score after update"
+
+    # New nodes and edges must show up as well
+    n3 = db.create_node("Late neighbor", {})
+    db.create_edge(n3.id, n1.id, "related", weight=2.0)
+    assert n3.id in db.compute_graph_scores(n1.id, depth=1), "Stale score after create"
+    assert db.get_stats() == {"nodes": 3, "edges": 2}, "Stale stats after create"
+    db.delete_node(n3.id)
+    assert db.get_stats() == {"nodes": 2, "edges": 1}, "Stale stats after delete"
+
+    # Nodes added after the index was built are appended to it in place
+    assert db.multi_source_hops([n1.id], depth=2)[0] == [n1.id, n2.id]
+    n4 = db.create_node("Appended", {})
+    assert db.node_ids()[-1] == n4.id, "New node not appended to index"
+    assert db.traverse_ints(n4.id, depth=1).tolist() == [len(db.node_ids()) - 1]
+    db.create_edge(n2.id, n4.id, "related", weight=1.0)
+    assert db.multi_source_hops([n1.id], depth=2)[0] == [n1.id, n2.id, n4.id], "Stale hops after create"
+    assert db.traverse_tree(n1.id, depth=2)[0] == [n1.id, n2.id, n4.id], "Stale tree after create"
+
+    assert not db.update_edge("missing-edge", weight=1.0), "Missing edge should not update"
+    print(f" Score cache invalidated correctly")
+
+    return True
+
+
+def test_embedding_search():
+    """Test cosine-similarity search over node embeddings"""
+    print("\nTesting embedding search...")
+    from graph_db import GraphDatabase
+
+    db = GraphDatabase(auto_persist=False)
+
+    x = db.create_node("X axis", {}, embedding=[2.0, 0.0, 0.0])
+    y = db.create_node("Y axis", {}, embedding=[0.0, 3.0, 0.0])
+    xy = db.create_node("Diagonal", {}, embedding=[1.0, 1.0, 0.0])
+    db.create_node("No embedding", {})
+    db.create_node("Other dimension", {}, embedding=[1.0, 0.0])
+
+    results = db.search_by_embedding([1.0, 0.1, 0.0], top_k=2)
+    assert [nid for nid, _ in results] == [x.id, xy.id], "Unexpected ranking"
+    assert abs(results[1][1] - (1.1 / (2 ** 0.5 * 1.01 ** 0.5))) < 1e-5, "Score is not cosine similarity"
+    print(f" Ranked {len(results)} nodes by cosine similarity")
+
+    quantized = db.search_by_embedding([1.0, 0.1, 0.0], top_k=2, quantized=True)
+    assert [nid for nid, _ in quantized] == [x.id, xy.id], "Quantized ranking differs"
+    assert quantized == results, "Shortlist was not rescored in float32"
+    print(f" Quantized search matches float search")
+
+    # Appends past the initial capacity, updates and deletes are all reflected
+    for i in range(40):
+        db.create_node(f"Filler {i}", {}, embedding=[0.0, 0.0, 1.0])
+    db.update_node(y.id, embedding=[1.0, 0.0, 0.0])
+    db.delete_node(x.id)
+    results = db.search_by_embedding([1.0, 0.0, 0.0], top_k=1)
+    assert results[0][0] == y.id, "Index not refreshed after update/delete"
+    assert len(db.search_by_embedding([0.0, 0.0, 1.0], top_k=100)) == 42, "Unexpected result count"
+
+    assert db.search_by_embedding([1.0, 2.0, 3.0, 4.0]) == [], "Unknown dimension should return nothing"
+    print(f" Embedding index stays consistent with mutations")
+
     return True
 
 
@@ -182,6 +339,38 @@ def test_persistence():
     os.remove(filepath)
     
     return True
+
+
+def test_batch_persistence():
+    """Test that batch() saves once, on exit"""
+    print("\nTesting batched persistence...")
+    from graph_db import GraphDatabase
+    import os
+    
+    filepath = "test_batch_persistence.json"
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    db = GraphDatabase(db_path=filepath, auto_persist=True)
+    
+    with db.batch():
+        n1 = db.create_node("Batched node 1")
+        with db.batch():
+            n2 = db.create_node("Batched node 2")
+        db.create_edge(n1.id, n2.id, "next")
+        assert not os.path.exists(filepath), "Saved inside batch"
+    assert db.auto_persist, "auto_persist not restored"
+    assert os.path.exists(filepath), "Not saved after batch"
+    print(" Saved once after batch")
+    
+    new_db = GraphDatabase(db_path=filepath, auto_persist=True)
+    assert new_db.get_stats() == db.get_stats(), "Stats mismatch after load"
+    print(f" Reloaded: {new_db.get_stats()}")
+    
+    # Cleanup
+    os.remove(filepath)
+    
+    return True
+
 def test_large_chunk_ingestion():
     """Test graph creation from 4 long text chunks (~1000 chars each)"""
     print("\nTesting ingestion of 4 large chunks...")
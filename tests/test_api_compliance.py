@@ -1,26 +1,30 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-import os
-import shutil
-
-# Setup/Teardown
-@pytest.fixture(scope="module")
-def client():
-    # Clean up DBs before test
-    if os.path.exists("db/graph_data_service.json"):
-        os.remove("db/graph_data_service.json")
-    if os.path.exists("db/chroma_db_service"):
-        shutil.rmtree("db/chroma_db_service")
-        
-    with TestClient(app) as c:
-        yield c
-        
-    # Clean up after test
-    if os.path.exists("db/graph_data_service.json"):
-        os.remove("db/graph_data_service.json")
-    if os.path.exists("db/chroma_db_service"):
-        shutil.rmtree("db/chroma_db_service")
+
+# The tests build on each other's data, in file order. Under pytest-xdist
+# (--dist loadgroup) this keeps them on one worker.
+pytestmark = pytest.mark.xdist_group("devforge_api")
+
+# Setup/Teardown. One app (and one lifespan startup) for the whole session;
+# the embedding model itself is loaded once per process by app.vector_db.
+# Both stores start empty in a temporary directory, removed by pytest.
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DEVFORGE_DB_DIR", str(tmp_path_factory.mktemp("db")))
+        with TestClient(app) as c:
+            # Pay the first-call costs (model weights, Chroma collection
+            # setup) here rather than inside test_1
+            warmup = c.post("/nodes", json={"id": "__warmup__", "text": "warmup", "regen_embedding": True})
+            assert warmup.status_code == 200
+            assert c.delete("/nodes/__warmup__").status_code == 200
+            yield c
+
+@pytest.fixture(scope="session")
+def shared():
+    # Values handed from one test to the next (e.g. the created edge's ID)
+    return {}
 
 def test_1_create_node(client):
     payload = {
@@ -45,10 +49,38 @@ def test_create_other_nodes(client):
         {"id": "doc6", "text": "Database scaling", "metadata": {"type": "book"}},
         {"id": "doc7", "text": "To be deleted", "metadata": {"type": "temp"}}
     ]
-    for n in nodes:
-        client.post("/nodes", json={**n, "regen_embedding": True})
+    # One request, so all four texts are embedded in a single model call
+    response = client.post("/nodes/bulk", json=[{**n, "regen_embedding": True} for n in nodes])
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == [n["id"] for n in nodes]
+
+def test_create_nodes_bulk(client):
+    payload = [
+        {"id": "bulk1", "text": "Bulk loaded note", "metadata": {"type": "bulk", "tags": ["a", "b"]}},
+        {"id": "bulk2", "text": "Bulk loaded note without embedding", "metadata": {"type": "bulk"}, "regen_embedding": False}
+    ]
+    response = client.post("/nodes/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["id"] for d in data] == ["bulk1", "bulk2"]
+    assert all(d["status"] == "created" for d in data)
+    assert data[0]["embedding_dim"] == 384
+    assert "embedding_dim" not in data[1]
+    
+    r = client.get("/nodes/bulk1")
+    assert r.status_code == 200
+    assert r.json()["metadata"] == {"type": "bulk", "tags": ["a", "b"]}
+    assert len(r.json()["embedding"]) == 384
 
-def test_5_create_edge(client):
+def test_get_nodes_bulk(client):
+    response = client.post("/nodes/lookup", json=["bulk2", "missing", "bulk1"])
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["id"] for d in data] == ["bulk2", "bulk1"]
+    assert data[1]["metadata"] == {"type": "bulk", "tags": ["a", "b"]}
+    assert len(data[1]["embedding"]) == 384
+
+def test_5_create_edge(client, shared):
     payload = {
         "source": "doc1",
         "target": "doc4",
@@ -63,9 +95,9 @@ def test_5_create_edge(client):
     assert data["source"] == "doc1"
     assert data["target"] == "doc4"
     # Store edge_id for later tests
-    pytest.edge_id = data["edge_id"]
+    shared["edge_id"] = data["edge_id"]
 
-def test_2_get_node(client):
+def test_2_get_node(client, shared):
     response = client.get("/nodes/doc1")
     assert response.status_code == 200
     data = response.json()
@@ -77,7 +109,7 @@ def test_2_get_node(client):
     # Check edge content
     edge = next((e for e in data["edges"] if e["target"] == "doc4"), None)
     assert edge is not None
-    assert edge["edge_id"] == pytest.edge_id
+    assert edge["edge_id"] == shared["edge_id"]
     assert edge["type"] == "related_to"
     assert edge["weight"] == 0.8
 
@@ -99,38 +131,38 @@ def test_3_update_node(client):
     assert r.json()["text"] == "Updated redis caching guide"
     assert r.json()["metadata"] == { "type": "guide" }
 
-def test_6_get_edge(client):
-    response = client.get(f"/edges/{pytest.edge_id}")
+def test_6_get_edge(client, shared):
+    response = client.get(f"/edges/{shared['edge_id']}")
     assert response.status_code == 200
     data = response.json()
-    assert data["edge_id"] == pytest.edge_id
+    assert data["edge_id"] == shared["edge_id"]
     assert data["source"] == "doc1"
     assert data["target"] == "doc4"
     assert data["type"] == "related_to"
     assert data["weight"] == 0.8
 
-def test_7_update_edge(client):
+def test_7_update_edge(client, shared):
     payload = { "weight": 0.95 }
-    response = client.put(f"/edges/{pytest.edge_id}", json=payload)
+    response = client.put(f"/edges/{shared['edge_id']}", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "updated"
-    assert data["edge_id"] == pytest.edge_id
+    assert data["edge_id"] == shared["edge_id"]
     assert data["new_weight"] == 0.95
     
     # Verify
-    r = client.get(f"/edges/{pytest.edge_id}")
+    r = client.get(f"/edges/{shared['edge_id']}")
     assert r.json()["weight"] == 0.95
 
-def test_8_delete_edge(client):
-    response = client.delete(f"/edges/{pytest.edge_id}")
+def test_8_delete_edge(client, shared):
+    response = client.delete(f"/edges/{shared['edge_id']}")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "deleted"
-    assert data["edge_id"] == pytest.edge_id
+    assert data["edge_id"] == shared["edge_id"]
     
     # Verify gone
-    r = client.get(f"/edges/{pytest.edge_id}")
+    r = client.get(f"/edges/{shared['edge_id']}")
     assert r.status_code == 404
 
 def test_4_delete_node(client):
@@ -170,6 +202,26 @@ def test_9_vector_search(client):
     # doc1 should be top result due to filter and text match
     assert data["results"][0]["id"] == "doc1"
 
+def test_vector_search_with_embedding(client):
+    # A node's own embedding finds that node first, without encoding the query
+    embedding = client.get("/nodes/doc2").json()["embedding"]
+    payload = {
+        "query_text": "by embedding",
+        "top_k": 3,
+        "embedding": embedding
+    }
+    response = client.post("/search/vector", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["query_text"] == "by embedding"
+    assert data["results"][0]["id"] == "doc2"
+    assert data["results"][0]["vector_score"] > 0.99
+
+    # An embedding of the wrong length is rejected, not a server error
+    response = client.post("/search/vector", json={**payload, "embedding": embedding[:10]})
+    assert response.status_code == 422
+    assert "expected 384" in response.json()["detail"]
+
 def test_10_graph_search(client):
     # Setup graph structure
     # doc6 -> doc2 (mentions, 0.9)